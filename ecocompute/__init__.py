@@ -6,7 +6,7 @@ Usage with Hugging Face Transformers:
     trainer.add_callback(EcoCallback())
 """
 
-from .callback import EcoCallback
+from .callback import EcoCallback, refresh_env
 
 __version__ = "1.0.0"
-__all__ = ["EcoCallback"]
+__all__ = ["EcoCallback", "refresh_env"]
@@ -8,23 +8,44 @@ Usage:
     trainer.add_callback(EcoCallback())
 """
 
+from __future__ import annotations
+
+import atexit
+import bisect
+import functools
+import queue
 import time
 import os
-from dataclasses import dataclass
-from typing import Optional
+import sys
+import threading
+import traceback
+import weakref
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Callable, List, NamedTuple, Optional
+
+import numpy as np
 
-try:
-    from transformers import TrainerCallback, TrainerControl, TrainerState
+if TYPE_CHECKING:
+    from transformers import TrainerControl, TrainerState
     from transformers.training_args import TrainingArguments
-except ImportError:
-    raise ImportError(
-        "transformers is required for EcoCallback. "
-        "Install with: pip install transformers"
-    )
 
 
-@dataclass
-class GPUProfile:
+def _ensure_transformers() -> None:
+    """Import transformers on first use so `import ecocompute` stays cheap."""
+    try:
+        import transformers  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            "transformers is required for EcoCallback. "
+            "Install with: pip install transformers"
+        )
+
+
+def _ignore_event(*args, **kwargs) -> None:
+    return None
+
+
+class GPUProfile(NamedTuple):
     """GPU specifications for cost and energy calculation."""
     name: str
     tflops: float  # FP16 TFLOPS
@@ -32,55 +53,126 @@ class GPUProfile:
     cost_per_hour: float  # USD
 
 
-# GPU profiles based on MLPerf benchmarks
+# GPU profiles based on MLPerf benchmarks, stored column-wise for bulk scoring
+_GPU_TABLE = np.array(
+    [
+        ("h100", "NVIDIA H100", 1979, 700, 3.50),
+        ("a100-80gb", "NVIDIA A100 80GB", 312, 400, 2.50),
+        ("a100-40gb", "NVIDIA A100 40GB", 312, 400, 2.21),
+        ("a10g", "NVIDIA A10G", 125, 150, 1.00),
+        ("v100", "NVIDIA V100", 125, 300, 1.50),
+        ("t4", "NVIDIA T4", 65, 70, 0.50),
+        ("l4", "NVIDIA L4", 121, 72, 0.80),
+        ("rtx4090", "NVIDIA RTX 4090", 330, 450, 1.20),
+        ("rtx3090", "NVIDIA RTX 3090", 142, 350, 0.80),
+    ],
+    dtype=[("key", "U16"), ("name", "U32"), ("tflops", "f8"), ("tdp", "i4"), ("cost", "f8")],
+)
+
 GPU_PROFILES = {
-    "h100": GPUProfile("NVIDIA H100", 1979, 700, 3.50),
-    "a100-80gb": GPUProfile("NVIDIA A100 80GB", 312, 400, 2.50),
-    "a100-40gb": GPUProfile("NVIDIA A100 40GB", 312, 400, 2.21),
-    "a10g": GPUProfile("NVIDIA A10G", 125, 150, 1.00),
-    "v100": GPUProfile("NVIDIA V100", 125, 300, 1.50),
-    "t4": GPUProfile("NVIDIA T4", 65, 70, 0.50),
-    "l4": GPUProfile("NVIDIA L4", 121, 72, 0.80),
-    "rtx4090": GPUProfile("NVIDIA RTX 4090", 330, 450, 1.20),
-    "rtx3090": GPUProfile("NVIDIA RTX 3090", 142, 350, 0.80),
+    str(row["key"]): GPUProfile(
+        str(row["name"]), float(row["tflops"]), int(row["tdp"]), float(row["cost"])
+    )
+    for row in _GPU_TABLE
 }
 
-# Carbon intensity by region (gCO2/kWh)
-CARBON_INTENSITY = {
-    "us-west": 350,
-    "us-east": 400,
-    "eu-west": 300,
-    "eu-north": 20,  # Sweden - very clean
-    "asia-east": 550,
-    "default": 400,
-}
+# Carbon intensity by region (gCO2/kWh), with the name shown in reports
+_REGION_TABLE = np.array(
+    [
+        ("us-west", "US-West", 350),
+        ("us-east", "US-East", 400),
+        ("eu-west", "EU-West", 300),
+        ("eu-north", "EU-North (Sweden)", 20),  # Sweden - very clean
+        ("asia-east", "Asia-East", 550),
+        ("default", "Default", 400),
+    ],
+    dtype=[("region", "U16"), ("display_name", "U32"), ("intensity", "i4")],
+)
+
+CARBON_INTENSITY = {str(row["region"]): int(row["intensity"]) for row in _REGION_TABLE}
+
+# (region, display name, intensity) of the lowest-carbon region, used for the relocation tip
+_CLEANEST = tuple(_REGION_TABLE[np.argmin(_REGION_TABLE["intensity"])].tolist())
+
+
+def rank_by_cost_per_flop() -> List[GPUProfile]:
+    """Return GPU profiles ordered from cheapest to most expensive per TFLOP-hour."""
+    order = np.argsort(_GPU_TABLE["cost"] / _GPU_TABLE["tflops"], kind="stable")
+    return [GPU_PROFILES[str(key)] for key in _GPU_TABLE["key"][order]]
+
+
+def _read_env() -> SimpleNamespace:
+    return SimpleNamespace(
+        region=os.environ.get("ECOCOMPUTE_REGION", "default"),
+        gpu=os.environ.get("ECOCOMPUTE_GPU"),
+        cost=os.environ.get("ECOCOMPUTE_COST_PER_HOUR"),
+    )
+
+
+# ECOCOMPUTE_* environment variables, read once at import
+_ENV = _read_env()
+
+
+def refresh_env() -> None:
+    """Re-read ECOCOMPUTE_* environment variables changed after import."""
+    global _ENV
+    _ENV = _read_env()
+
+
+# Substrings of the lowercased CUDA device name -> GPU_PROFILES key, first match wins
+_GPU_PATTERNS = (
+    (("h100",), "h100"),
+    (("a100", "80g"), "a100-80gb"),
+    (("a100",), "a100-40gb"),
+    (("a10g",), "a10g"),
+    (("v100",), "v100"),
+    (("t4",), "t4"),
+    (("l4",), "l4"),
+    (("4090",), "rtx4090"),
+    (("3090",), "rtx3090"),
+)
+
+# Cached result of a successful CUDA device probe
+_detected_gpu: Optional[GPUProfile] = None
+
+
+def _cuda_hidden() -> bool:
+    """True when CUDA_VISIBLE_DEVICES explicitly hides every GPU."""
+    return os.environ.get("CUDA_VISIBLE_DEVICES") == ""
+
+
+def _loaded_torch():
+    """
+    Return torch if it is already imported and GPUs are not hidden, else None.
+    
+    Probing never imports torch itself: inside a Trainer it is always loaded,
+    and on CPU-only CI the import alone would cost hundreds of milliseconds.
+    """
+    if _cuda_hidden():
+        return None
+    return sys.modules.get("torch")
 
 
 def detect_gpu() -> GPUProfile:
     """Auto-detect GPU type from CUDA device name."""
+    global _detected_gpu
+    if _detected_gpu is not None:
+        return _detected_gpu
+    
+    torch = _loaded_torch()
+    if torch is None:
+        return GPU_PROFILES["a100-40gb"]
+    
     try:
-        import torch
         if torch.cuda.is_available():
             gpu_name = torch.cuda.get_device_name(0).lower()
-            
-            if "h100" in gpu_name:
-                return GPU_PROFILES["h100"]
-            elif "a100" in gpu_name:
-                if "80g" in gpu_name:
-                    return GPU_PROFILES["a100-80gb"]
-                return GPU_PROFILES["a100-40gb"]
-            elif "a10g" in gpu_name:
-                return GPU_PROFILES["a10g"]
-            elif "v100" in gpu_name:
-                return GPU_PROFILES["v100"]
-            elif "t4" in gpu_name:
-                return GPU_PROFILES["t4"]
-            elif "l4" in gpu_name:
-                return GPU_PROFILES["l4"]
-            elif "4090" in gpu_name:
-                return GPU_PROFILES["rtx4090"]
-            elif "3090" in gpu_name:
-                return GPU_PROFILES["rtx3090"]
+            # Default to A100 if the device name is not recognized
+            _detected_gpu = GPU_PROFILES["a100-40gb"]
+            for substrings, key in _GPU_PATTERNS:
+                if all(sub in gpu_name for sub in substrings):
+                    _detected_gpu = GPU_PROFILES[key]
+                    break
+            return _detected_gpu
     except Exception:
         pass
     
@@ -88,22 +180,240 @@ def detect_gpu() -> GPUProfile:
     return GPU_PROFILES["a100-40gb"]
 
 
+@functools.lru_cache(maxsize=16)
+def _lookup_carbon_intensity(region: str) -> int:
+    return CARBON_INTENSITY.get(region.lower(), CARBON_INTENSITY["default"])
+
+
 def get_carbon_intensity(region: Optional[str] = None) -> int:
     """Get carbon intensity for a region."""
     if region is None:
-        region = os.environ.get("ECOCOMPUTE_REGION", "default")
-    return CARBON_INTENSITY.get(region.lower(), CARBON_INTENSITY["default"])
+        region = _ENV.region
+    return _lookup_carbon_intensity(region)
+
+
+# Duration unit boundaries in nanoseconds, and the (unit, decimals, name) used below each
+_NS_PER_SECOND = 10**9
+_DURATION_THRESHOLDS_NS = (60 * _NS_PER_SECOND, 3600 * _NS_PER_SECOND, 86400 * _NS_PER_SECOND)
+_DURATION_UNITS = (
+    (_NS_PER_SECOND, 1, "seconds"),
+    (60 * _NS_PER_SECOND, 1, "minutes"),
+    (3600 * _NS_PER_SECOND, 2, "hours"),
+    (86400 * _NS_PER_SECOND, 1, "days"),
+)
+
+# Report sections, filled with str.format_map in EcoCallback._print_report
+_REPORT_TEMPLATE = (
+    "\n\n"
+    "🌿 EcoCompute AI Report\n"
+    + "═" * 58 + "\n"
+    "This run cost ${total_cost:.2f} and emitted {carbon_kg:.1f} kg CO₂e\n"
+    + "═" * 58 + "\n"
+)
+_DETAILS_TEMPLATE = (
+    "\n📊 Details:\n"
+    "   Duration:     {duration}\n"
+    "   GPU:          {gpu_name} x {num_gpus}\n"
+    "   Energy:       {energy_kwh:.2f} kWh\n"
+    "   Region:       {region} ({carbon_intensity} gCO₂/kWh)\n"
+)
+_STEPS_TEMPLATE = (
+    "   Steps:        {global_step:,}\n"
+    "   Cost/step:    ${cost_per_step:.6f}\n"
+)
+_TIPS_HEADER = "\n💡 Tips:\n"
+_REGION_TIP_TEMPLATE = "   → Training in {cleanest_name} would save {region_savings:.1f} kg CO₂e\n"
+_PRECISION_TIP = "   → Consider mixed precision (FP16/BF16) for 30-50% speedup\n"
+_GPU_TIP_TEMPLATE = (
+    "   → {best_gpu} has the lowest cost per TFLOP (${best_cost_per_tflop:.4f}/TFLOP-hour)\n"
+)
+_LEARN_MORE = "\n📄 Learn more: https://hongping-zh.github.io/ecocompute-ai/calculator/\n"
+
+# Seconds between GPU power samples
+POWER_SAMPLE_INTERVAL = 0.25
+
+
+def _nvml_handle(pynvml, index: int):
+    """
+    NVML handle for CUDA device `index`.
+    
+    NVML enumerates physical GPUs and ignores CUDA_VISIBLE_DEVICES, so the
+    index is mapped through it the way CUDA does; entries may be indices or
+    (prefixes of) GPU UUIDs. Raises if the device cannot be mapped, e.g. for
+    MIG instances, so the caller falls back to TDP.
+    """
+    visible = os.environ.get("CUDA_VISIBLE_DEVICES")
+    if visible is None:
+        return pynvml.nvmlDeviceGetHandleByIndex(index)
+    
+    entry = visible.split(",")[index].strip()
+    if entry.isdigit():
+        return pynvml.nvmlDeviceGetHandleByIndex(int(entry))
+    if entry.startswith("GPU-"):
+        matches = []
+        for physical in range(pynvml.nvmlDeviceGetCount()):
+            handle = pynvml.nvmlDeviceGetHandleByIndex(physical)
+            uuid = pynvml.nvmlDeviceGetUUID(handle)
+            if isinstance(uuid, bytes):
+                uuid = uuid.decode()
+            if uuid.startswith(entry):
+                matches.append(handle)
+        if len(matches) == 1:
+            return matches[0]
+    raise ValueError(f"Cannot map CUDA device {entry!r} to an NVML device")
+
+
+@functools.lru_cache(maxsize=None)
+def _nvml_power_reader() -> Callable[[int], float]:
+    """
+    Build a pynvml-backed reader returning device power draw in milliwatts.
+    NVML is initialized once per process and shut down at exit.
+    """
+    import pynvml
+
+    pynvml.nvmlInit()
+    atexit.register(pynvml.nvmlShutdown)
+    handles = {}
+
+    def read(index: int) -> float:
+        handle = handles.get(index)
+        if handle is None:
+            handle = handles[index] = _nvml_handle(pynvml, index)
+        return pynvml.nvmlDeviceGetPowerUsage(handle)
+
+    return read
+
+
+def get_power_reader() -> Optional[Callable[[int], float]]:
+    """Return a function reading GPU power draw (mW) by device index, or None."""
+    if _cuda_hidden():
+        return None
+    
+    candidates = []
+    torch = _loaded_torch()
+    try:
+        if torch is not None and torch.cuda.is_available() and hasattr(torch.cuda, "power_draw"):
+            candidates.append(lambda: torch.cuda.power_draw)
+    except Exception:
+        pass
+    candidates.append(_nvml_power_reader)
+    
+    for make_reader in candidates:
+        try:
+            read = make_reader()
+            read(0)  # Probe once so a broken backend falls through
+            return read
+        except Exception:
+            continue
+    return None
+
+
+class PowerSampler:
+    """
+    Samples GPU power draw on a daemon thread and integrates it into energy.
+    
+    The training loop never waits on telemetry: samples are taken off-thread
+    and folded into a running trapezoidal integral (∫P dt) per device.
+    """
+    
+    def __init__(
+        self,
+        read_power: Callable[[int], float],
+        num_devices: int,
+        interval: float = POWER_SAMPLE_INTERVAL,
+    ):
+        self._read_power = read_power
+        self._interval = interval
+        self._last = [None] * num_devices  # (t, mW) per device
+        self._joules = [0.0] * num_devices
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="ecocompute-power", daemon=True
+        )
+    
+    def start(self) -> None:
+        self._thread.start()
+    
+    def cancel(self) -> None:
+        """Stop sampling without waiting for the thread or closing the integral."""
+        self._stop.set()
+    
+    def _sample(self) -> None:
+        now = time.monotonic()
+        for index, last in enumerate(self._last):
+            try:
+                milliwatts = self._read_power(index)
+            except Exception:
+                continue
+            if last is not None:
+                last_t, last_mw = last
+                self._joules[index] += (last_mw + milliwatts) / 2000 * (now - last_t)
+            self._last[index] = (now, milliwatts)
+    
+    def _run(self) -> None:
+        while True:
+            self._sample()
+            if self._stop.wait(self._interval):
+                return
+    
+    def stop(self) -> Optional[float]:
+        """
+        Stop sampling and return measured energy in kWh. Returns None unless
+        every device was measured, so a partial total never stands in for
+        the whole run.
+        """
+        self._stop.set()
+        self._thread.join()
+        self._sample()  # Close the integral at the end of training
+        if any(last is None for last in self._last):
+            return None
+        return sum(self._joules) / 3.6e6
+
+
+# One writer thread prints the reports of every EcoCallback in the process
+_report_queue: Optional[queue.Queue] = None
+_report_queue_lock = threading.Lock()
 
 
-class EcoCallback(TrainerCallback):
+def _report_writer_queue() -> queue.Queue:
+    """Return the report queue, starting its writer thread on first use."""
+    global _report_queue
+    with _report_queue_lock:
+        if _report_queue is None:
+            _report_queue = queue.Queue()
+            threading.Thread(
+                target=_write_reports, args=(_report_queue,), name="ecocompute-report", daemon=True
+            ).start()
+            # Drain pending reports before the interpreter exits
+            atexit.register(_report_queue.join)
+        return _report_queue
+
+
+def _write_reports(reports: queue.Queue) -> None:
+    while True:
+        print_report, report = reports.get()
+        try:
+            print_report(**report)
+        except Exception:
+            # Keep the writer alive so the atexit drain cannot hang
+            traceback.print_exc()
+        finally:
+            reports.task_done()
+
+
+class EcoCallback:
     """
     Hugging Face Trainer callback for tracking training cost and carbon emissions.
     
+    Duck-types transformers.TrainerCallback so that importing ecocompute does
+    not import transformers; Trainer dispatches events by name, and events
+    not handled here are no-ops.
+    
     Usage:
         from ecocompute import EcoCallback
         trainer.add_callback(EcoCallback())
     
-    Environment variables:
+    Environment variables (read at import; call refresh_env() after changing them):
         ECOCOMPUTE_REGION: Cloud region for carbon intensity (default: "default")
         ECOCOMPUTE_GPU: Override GPU type (e.g., "h100", "a100-80gb")
         ECOCOMPUTE_COST_PER_HOUR: Override hourly cost in USD
@@ -142,18 +452,26 @@ class EcoCallback(TrainerCallback):
             num_gpus: Number of GPUs (auto-detected if None)
             verbose: Print detailed report (default: True)
         """
-        self.gpu_type = gpu or os.environ.get("ECOCOMPUTE_GPU")
-        self.region = region or os.environ.get("ECOCOMPUTE_REGION", "default")
+        _ensure_transformers()
+        
+        self.gpu_type = gpu or _ENV.gpu
+        self.region = region or _ENV.region
         self.cost_override = cost_per_hour or (
-            float(os.environ["ECOCOMPUTE_COST_PER_HOUR"]) 
-            if "ECOCOMPUTE_COST_PER_HOUR" in os.environ else None
+            float(_ENV.cost) if _ENV.cost is not None else None
         )
         self.num_gpus_override = num_gpus
         self.verbose = verbose
         
-        self.start_time: Optional[float] = None
+        self.start_ns: Optional[int] = None
         self.gpu_profile: Optional[GPUProfile] = None
         self.num_gpus: int = 1
+        self.power_sampler: Optional[PowerSampler] = None
+    
+    def __getattr__(self, name: str):
+        # Trainer calls every callback event by name; untracked events are no-ops
+        if name.startswith("on_"):
+            return _ignore_event
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
         
     def on_train_begin(
         self,
@@ -163,7 +481,9 @@ class EcoCallback(TrainerCallback):
         **kwargs,
     ):
         """Called at the beginning of training."""
-        self.start_time = time.time()
+        # A previous run that never reached on_train_end may still be sampling
+        self._stop_power_sampler()
+        self.start_ns = time.monotonic_ns()
         
         # Detect GPU
         if self.gpu_type and self.gpu_type.lower() in GPU_PROFILES:
@@ -175,12 +495,25 @@ class EcoCallback(TrainerCallback):
         if self.num_gpus_override:
             self.num_gpus = self.num_gpus_override
         else:
+            torch = _loaded_torch()
             try:
-                import torch
-                self.num_gpus = torch.cuda.device_count() or 1
+                self.num_gpus = (torch.cuda.device_count() if torch is not None else 0) or 1
             except Exception:
                 self.num_gpus = 1
         
+        # Only local rank 0 samples power and reports under DDP
+        if not state.is_local_process_zero:
+            return
+        
+        read_power = get_power_reader()
+        if read_power is not None:
+            self.power_sampler = PowerSampler(read_power, self.num_gpus)
+            self.power_sampler.start()
+            # Do not let the sampler outlive a callback that is discarded mid-run
+            weakref.finalize(self, self.power_sampler.cancel)
+        
+        _report_writer_queue()
+        
         if self.verbose:
             print(f"\n🌿 EcoCompute AI tracking started")
             print(f"   GPU: {self.gpu_profile.name} x {self.num_gpus}")
@@ -194,85 +527,113 @@ class EcoCallback(TrainerCallback):
         **kwargs,
     ):
         """Called at the end of training."""
-        if self.start_time is None or self.gpu_profile is None:
+        if self.start_ns is None or self.gpu_profile is None:
+            return
+        if not state.is_local_process_zero:
             return
         
-        # Calculate duration
-        duration_seconds = time.time() - self.start_time
+        # Calculate duration on the monotonic clock (immune to NTP jumps)
+        duration_ns = time.monotonic_ns() - self.start_ns
+        duration_seconds = duration_ns * 1e-9
         duration_hours = duration_seconds / 3600
         
+        # Skip the report for no-op runs (e.g. max_steps=0 smoke tests)
+        if duration_seconds < 1.0:
+            self._stop_power_sampler()
+            return
+        
         # Calculate cost
         cost_per_hour = self.cost_override or self.gpu_profile.cost_per_hour
         total_cost = cost_per_hour * duration_hours * self.num_gpus
         
-        # Calculate energy (kWh)
-        power_kw = (self.gpu_profile.tdp / 1000) * self.num_gpus
-        energy_kwh = power_kw * duration_hours
+        # Calculate energy (kWh) from measured power, else TDP x duration
+        energy_kwh = self._stop_power_sampler()
+        if energy_kwh is None:
+            power_kw = (self.gpu_profile.tdp / 1000) * self.num_gpus
+            energy_kwh = power_kw * duration_hours
         
         # Calculate carbon emissions
         carbon_intensity = get_carbon_intensity(self.region)
         carbon_kg = (energy_kwh * carbon_intensity) / 1000
         
-        # Format output
-        self._print_report(
-            duration_hours=duration_hours,
-            total_cost=total_cost,
-            energy_kwh=energy_kwh,
-            carbon_kg=carbon_kg,
-            state=state,
-        )
+        # Format and print off the trainer's shutdown path
+        _report_writer_queue().put((self._print_report, {
+            "duration_ns": duration_ns,
+            "total_cost": total_cost,
+            "energy_kwh": energy_kwh,
+            "carbon_kg": carbon_kg,
+            "carbon_intensity": carbon_intensity,
+            "global_step": state.global_step,
+        }))
+    
+    def _stop_power_sampler(self) -> Optional[float]:
+        """Stop the running power sampler, if any, and return its energy in kWh."""
+        sampler, self.power_sampler = self.power_sampler, None
+        return sampler.stop() if sampler is not None else None
     
     def _print_report(
         self,
-        duration_hours: float,
+        duration_ns: int,
         total_cost: float,
         energy_kwh: float,
         carbon_kg: float,
-        state: TrainerState,
+        carbon_intensity: int,
+        global_step: int,
     ):
         """Print the EcoCompute report."""
-        # Main summary line
-        print("\n")
-        print("🌿 EcoCompute AI Report")
-        print("═" * 58)
-        print(f"This run cost ${total_cost:.2f} and emitted {carbon_kg:.1f} kg CO₂e")
-        print("═" * 58)
+        ctx = {
+            "total_cost": total_cost,
+            "carbon_kg": carbon_kg,
+        }
+        parts = [_REPORT_TEMPLATE]
         
         if self.verbose:
             # Detailed breakdown
-            print(f"\n📊 Details:")
-            print(f"   Duration:     {self._format_duration(duration_hours)}")
-            print(f"   GPU:          {self.gpu_profile.name} x {self.num_gpus}")
-            print(f"   Energy:       {energy_kwh:.2f} kWh")
-            print(f"   Region:       {self.region} ({get_carbon_intensity(self.region)} gCO₂/kWh)")
+            ctx.update(
+                duration=self._format_duration_ns(duration_ns),
+                gpu_name=self.gpu_profile.name,
+                num_gpus=self.num_gpus,
+                energy_kwh=energy_kwh,
+                region=self.region,
+                carbon_intensity=carbon_intensity,
+            )
+            parts.append(_DETAILS_TEMPLATE)
             
-            if state.global_step > 0:
-                cost_per_step = total_cost / state.global_step
-                print(f"   Steps:        {state.global_step:,}")
-                print(f"   Cost/step:    ${cost_per_step:.6f}")
+            if global_step > 0:
+                ctx.update(global_step=global_step, cost_per_step=total_cost / global_step)
+                parts.append(_STEPS_TEMPLATE)
             
             # Optimization tips
-            print(f"\n💡 Tips:")
-            if self.region not in ["eu-north"]:
-                potential_carbon = (energy_kwh * 20) / 1000  # EU-North intensity
-                savings = carbon_kg - potential_carbon
-                print(f"   → Training in EU-North (Sweden) would save {savings:.1f} kg CO₂e")
+            parts.append(_TIPS_HEADER)
+            cleanest_region, cleanest_name, cleanest_intensity = _CLEANEST
+            if self.region.lower() != cleanest_region:
+                ctx.update(
+                    cleanest_name=cleanest_name,
+                    region_savings=energy_kwh * (carbon_intensity - cleanest_intensity) / 1000,
+                )
+                parts.append(_REGION_TIP_TEMPLATE)
             
             if total_cost > 10:
-                print(f"   → Consider mixed precision (FP16/BF16) for 30-50% speedup")
+                parts.append(_PRECISION_TIP)
+            
+            best_value = rank_by_cost_per_flop()[0]
+            if best_value != self.gpu_profile:
+                ctx.update(
+                    best_gpu=best_value.name,
+                    best_cost_per_tflop=best_value.cost_per_hour / best_value.tflops,
+                )
+                parts.append(_GPU_TIP_TEMPLATE)
             
-            print(f"\n📄 Learn more: https://hongping-zh.github.io/ecocompute-ai/calculator/")
+            parts.append(_LEARN_MORE)
         
-        print("")
+        print("".join(parts).format_map(ctx))
     
     @staticmethod
-    def _format_duration(hours: float) -> str:
-        """Format duration in human-readable format."""
-        if hours < 1/60:
-            return f"{hours * 3600:.1f} seconds"
-        elif hours < 1:
-            return f"{hours * 60:.1f} minutes"
-        elif hours < 24:
-            return f"{hours:.2f} hours"
-        else:
-            return f"{hours / 24:.1f} days"
+    def _format_duration_ns(ns: int) -> str:
+        """Format a nanosecond duration in human-readable format."""
+        unit_ns, decimals, name = _DURATION_UNITS[bisect.bisect_right(_DURATION_THRESHOLDS_NS, ns)]
+        # Fixed-point rounding in integers: no float error on long runs
+        scale = 10**decimals
+        scaled = (ns * scale + unit_ns // 2) // unit_ns
+        whole, frac = divmod(scaled, scale)
+        return f"{whole}.{frac:0{decimals}d} {name}"
@@ -0,0 +1,110 @@
+"""
+Token FinOps Kernels - EcoCompute AI
+Batched cost kernels for parameter sweeps over tasks and agent swarms, and
+the per-turn kernel behind the token simulation log.
+
+Numba is optional: when it is installed the kernels are JIT-compiled once
+(and cached on disk), otherwise an equivalent NumPy implementation is used.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+
+def _batch_predict_numpy(turns, base_in, delta, avg_out, in_prices, out_prices):
+    total_in = turns * base_in + delta * turns * (turns - 1) // 2
+    total_out = turns * avg_out
+    return (
+        np.outer(total_in / 1_000_000, in_prices)
+        + np.outer(total_out / 1_000_000, out_prices)
+    )
+
+
+if HAVE_NUMBA:
+    @njit(parallel=True, cache=True)
+    def _batch_predict_jit(turns, base_in, delta, avg_out, in_prices, out_prices):
+        n_tasks = turns.shape[0]
+        n_agents = in_prices.shape[0]
+        costs = np.empty((n_tasks, n_agents))
+        for i in prange(n_tasks):
+            t = turns[i]
+            total_in = t * base_in[i] + delta[i] * t * (t - 1) // 2
+            total_out = t * avg_out[i]
+            for j in range(n_agents):
+                costs[i, j] = (
+                    (total_in / 1_000_000) * in_prices[j]
+                    + (total_out / 1_000_000) * out_prices[j]
+                )
+        return costs
+
+
+def batch_predict(turns, base_in, delta, avg_out, in_prices, out_prices) -> np.ndarray:
+    """
+    Closed-form cost of every task for every agent.
+
+    Task parameters are int64 arrays of shape (n_tasks,): turns, base input
+    tokens per turn, history growth per turn and output tokens per turn.
+    Prices are float64 arrays of shape (n_agents,) in $ per 1M tokens.
+    Returns a (n_tasks, n_agents) array of total costs in USD. Negative turn
+    counts are treated as zero turns.
+    """
+    args = (
+        np.maximum(np.ascontiguousarray(turns, dtype=np.int64), 0),
+        np.ascontiguousarray(base_in, dtype=np.int64),
+        np.ascontiguousarray(delta, dtype=np.int64),
+        np.ascontiguousarray(avg_out, dtype=np.int64),
+        np.ascontiguousarray(in_prices, dtype=np.float64),
+        np.ascontiguousarray(out_prices, dtype=np.float64),
+    )
+    if HAVE_NUMBA:
+        return _batch_predict_jit(*args)
+    return _batch_predict_numpy(*args)
+
+
+def _simulate_turns_py(first_input, history, turns, avg_out, growth,
+                       in_price, out_price, context_window):
+    input_tokens = np.empty(turns, dtype=np.int64)
+    turn_cost = np.empty(turns)
+    cumulative_cost = np.empty(turns)
+    total_cost = 0.0
+    ran = 0
+    for i in range(turns):
+        current_input = first_input + history
+        if current_input > context_window:
+            break
+        cost = (current_input / 1000) * in_price + (avg_out / 1000) * out_price
+        total_cost += cost
+        input_tokens[i] = current_input
+        turn_cost[i] = cost
+        cumulative_cost[i] = total_cost
+        history += growth
+        ran += 1
+    return input_tokens[:ran], turn_cost[:ran], cumulative_cost[:ran]
+
+
+if HAVE_NUMBA:
+    _simulate_turns_jit = njit(cache=True)(_simulate_turns_py)
+
+
+def simulate_turns(first_input, history, turns, avg_out, growth,
+                   in_price, out_price, context_window):
+    """
+    Per-turn token and cost series of one agent working through a task.
+
+    Each turn reads first_input + history tokens and the history then grows
+    by growth tokens; prices are $ per 1K tokens. The run stops at the first
+    turn whose input exceeds context_window. Returns three arrays covering
+    the turns that ran: input tokens, turn cost and cumulative cost.
+    """
+    args = (
+        int(first_input), int(history), max(int(turns), 0), int(avg_out), int(growth),
+        float(in_price), float(out_price), int(context_window),
+    )
+    if HAVE_NUMBA:
+        return _simulate_turns_jit(*args)
+    return _simulate_turns_py(*args)
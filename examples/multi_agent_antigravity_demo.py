@@ -13,16 +13,19 @@ Problem: Multi-agent systems suffer from "Context Ballooning"
 Solution: EcoCompute Agent FinOps predicts costs BEFORE execution
 """
 
-from dataclasses import dataclass
-from typing import List, Dict
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+import functools
 import json
 
+import numpy as np
+
+from finops_kernels import batch_predict
+
 # ============================================================
 # PART 1: Define Multi-Agent Architecture (Antigravity Style)
 # ============================================================
 
-@dataclass
-class AgentConfig:
+class AgentConfig(NamedTuple):
     """Configuration for a single agent in the swarm"""
     name: str
     role: str
@@ -31,8 +34,7 @@ class AgentConfig:
     input_price_per_1m: float  # $ per 1M tokens
     output_price_per_1m: float
 
-@dataclass
-class Task:
+class Task(NamedTuple):
     """A development task assigned to agents"""
     id: str
     description: str
@@ -87,6 +89,128 @@ AGENT_SWARM = [
 # PART 2: Cost Prediction Engine (EcoCompute Agent FinOps)
 # ============================================================
 
+SYSTEM_PROMPT_TOKENS = 2000  # Fixed overhead per turn
+ACK_TOKENS = 50  # User acknowledgment appended to history each turn
+
+
+def predict_task_tokens(
+    turns: int,
+    repo_context_tokens: int,
+    avg_output_tokens: int = 1000
+) -> Tuple[int, int]:
+    """
+    Total (input, output) tokens for one agent completing a task.
+    
+    History grows by a fixed amount each turn, so input tokens form an
+    arithmetic series and the totals have a closed form. A non-positive
+    turn count runs no turns, matching the turn-by-turn loop.
+    """
+    turns = max(turns, 0)
+    base_tokens = SYSTEM_PROMPT_TOKENS + repo_context_tokens
+    history_growth = avg_output_tokens + ACK_TOKENS
+    
+    total_input_tokens = turns * base_tokens + history_growth * turns * (turns - 1) // 2
+    return total_input_tokens, turns * avg_output_tokens
+
+
+class WorkflowPrediction(NamedTuple):
+    """Immutable swarm cost prediction, shared between callers via the cache."""
+    agent_costs: Tuple[float, ...]
+    total_input_tokens: int
+    total_output_tokens: int
+    subtotal: float
+    coordination_overhead: float
+    total_predicted_cost: float
+    cost_per_turn_avg: float
+
+
+@functools.lru_cache(maxsize=128)
+def _predict_cached(
+    prices: Tuple[Tuple[float, ...], Tuple[float, ...]],
+    task_key: Tuple[int, int],
+    avg_output_tokens: int,
+    coordination_overhead: float
+) -> WorkflowPrediction:
+    """Price a task for a swarm, keyed only on the inputs that affect cost."""
+    estimated_turns, repo_context_tokens = task_key
+    
+    # Every agent sees the same token series; only prices differ
+    total_input_tokens, total_output_tokens = predict_task_tokens(
+        estimated_turns, repo_context_tokens, avg_output_tokens
+    )
+    costs = (
+        (total_input_tokens / 1_000_000) * np.asarray(prices[0])
+        + (total_output_tokens / 1_000_000) * np.asarray(prices[1])
+    )
+    total_cost = float(costs.sum())
+    
+    # Add coordination overhead (agents sharing context)
+    coordination_cost = total_cost * coordination_overhead
+    total_with_overhead = total_cost + coordination_cost
+    
+    return WorkflowPrediction(
+        agent_costs=tuple(float(cost) for cost in costs),
+        total_input_tokens=total_input_tokens,
+        total_output_tokens=total_output_tokens,
+        subtotal=total_cost,
+        coordination_overhead=coordination_cost,
+        total_predicted_cost=total_with_overhead,
+        cost_per_turn_avg=total_with_overhead / estimated_turns,
+    )
+
+
+@functools.lru_cache(maxsize=128)
+def _suggest_cached(
+    agent_costs: Tuple[Tuple[str, str, float], ...],
+    total_predicted_cost: float,
+    num_agents: int,
+    coordination_overhead: float
+) -> Tuple[Dict, ...]:
+    """Suggestions for a prediction, keyed on (agent, model, cost) and the totals."""
+    suggestions = []
+    remaining_cost = total_predicted_cost
+    
+    # Check for expensive models on simple tasks (pick the most expensive one)
+    most_expensive = None
+    for entry in agent_costs:
+        if "pro" in entry[1].lower() and (most_expensive is None or entry[2] > most_expensive[2]):
+            most_expensive = entry
+    if most_expensive is not None:
+        # Only suggest downgrading the most expensive Pro agent
+        agent, model, cost = most_expensive
+        savings = cost * 0.85  # Flash is ~10x cheaper, save 85%
+        suggestions.append({
+            "type": "MODEL_DOWNGRADE",
+            "agent": agent,
+            "current_model": model,
+            "suggested_model": "gemini-2.0-flash",
+            "potential_savings": savings,
+            "recommendation": f"Downgrade {agent} to Flash for routine tasks"
+        })
+        remaining_cost -= savings
+    
+    # Check for context ballooning (only if still significant cost)
+    if remaining_cost > 2.0:
+        context_savings = remaining_cost * 0.20  # 20% savings from context pruning
+        suggestions.append({
+            "type": "CONTEXT_PRUNING",
+            "recommendation": "Implement sliding window context (keep last 5 turns only)",
+            "potential_savings": context_savings
+        })
+        remaining_cost -= context_savings
+    
+    # Check for parallelization waste
+    if num_agents > 3 and remaining_cost > 1.0:
+        consolidation_savings = coordination_overhead * 0.4
+        suggestions.append({
+            "type": "AGENT_CONSOLIDATION",
+            "recommendation": f"Merge {num_agents} agents into 3 specialized agents",
+            "potential_savings": consolidation_savings
+        })
+    
+    return tuple(suggestions)
+
+
 class AgentFinOpsPredictor:
     """
     Predicts token costs for multi-agent workflows BEFORE execution.
@@ -95,128 +219,156 @@ class AgentFinOpsPredictor:
     
     def __init__(self, agents: List[AgentConfig]):
         self.agents = agents
+        # Per-agent prices as parallel arrays for vectorized swarm costing
+        self._in_prices = np.array([a.input_price_per_1m for a in agents], dtype=np.float64)
+        self._out_prices = np.array([a.output_price_per_1m for a in agents], dtype=np.float64)
+        self._price_key = (tuple(self._in_prices.tolist()), tuple(self._out_prices.tolist()))
     
     def predict_single_agent_cost(
         self, 
         agent: AgentConfig, 
         task: Task,
-        avg_output_tokens: int = 1000
+        avg_output_tokens: int = 1000,
+        include_turns: bool = False
     ) -> Dict:
         """
         Predict cost for a single agent completing a task.
         Models the "Context Ballooning" effect.
+        
+        The per-turn breakdown is only built when include_turns is set.
         """
+        total_input_tokens, total_output_tokens = predict_task_tokens(
+            task.estimated_turns, task.repo_context_tokens, avg_output_tokens
+        )
+        total_cost = (
+            (total_input_tokens / 1_000_000) * agent.input_price_per_1m
+            + (total_output_tokens / 1_000_000) * agent.output_price_per_1m
+        )
+        
+        prediction = {
+            "agent": agent.name,
+            "model": agent.model,
+            "total_cost": total_cost,
+            "total_input_tokens": total_input_tokens,
+            "total_output_tokens": total_output_tokens,
+        }
+        if include_turns:
+            prediction["turns"] = list(self.iter_turns(agent, task, avg_output_tokens))
+        return prediction
+    
+    def iter_turns(
+        self,
+        agent: AgentConfig,
+        task: Task,
+        avg_output_tokens: int = 1000
+    ) -> Iterator[Dict]:
+        """Yield the per-turn cost breakdown for a single agent."""
         total_cost = 0.0
         history_tokens = 0
-        turn_breakdown = []
         
-        system_prompt_tokens = 2000  # Fixed overhead
+        # Hoist per-task invariants out of the turn loop
+        base_tokens = SYSTEM_PROMPT_TOKENS + task.repo_context_tokens
+        history_growth = avg_output_tokens + ACK_TOKENS
+        in_rate = agent.input_price_per_1m * 1e-6  # $ per input token
+        out_cost_per_turn = avg_output_tokens * agent.output_price_per_1m * 1e-6
         
         for turn in range(1, task.estimated_turns + 1):
             # Input = System + Repo Context + Conversation History
-            input_tokens = system_prompt_tokens + task.repo_context_tokens + history_tokens
-            
-            # Calculate costs
-            input_cost = (input_tokens / 1_000_000) * agent.input_price_per_1m
-            output_cost = (avg_output_tokens / 1_000_000) * agent.output_price_per_1m
-            turn_cost = input_cost + output_cost
+            input_tokens = base_tokens + history_tokens
+            turn_cost = input_tokens * in_rate + out_cost_per_turn
             
             total_cost += turn_cost
-            turn_breakdown.append({
+            yield {
                 "turn": turn,
                 "input_tokens": input_tokens,
                 "output_tokens": avg_output_tokens,
                 "cost": turn_cost,
                 "cumulative_cost": total_cost
-            })
+            }
             
             # Context Ballooning: output becomes part of next input
-            history_tokens += avg_output_tokens + 50  # +50 for user acknowledgment
-        
-        return {
-            "agent": agent.name,
-            "model": agent.model,
-            "total_cost": total_cost,
-            "total_input_tokens": sum(t["input_tokens"] for t in turn_breakdown),
-            "total_output_tokens": task.estimated_turns * avg_output_tokens,
-            "turns": turn_breakdown
-        }
+            history_tokens += history_growth
     
     def predict_parallel_workflow_cost(
         self, 
         task: Task,
-        coordination_overhead: float = 0.2  # 20% extra for agent coordination
+        coordination_overhead: float = 0.2,  # 20% extra for agent coordination
+        avg_output_tokens: int = 1000
     ) -> Dict:
         """
         Predict total cost for parallel multi-agent workflow.
         This is where costs EXPLODE without proper FinOps.
-        """
-        agent_costs = []
-        total_cost = 0.0
         
-        for agent in self.agents:
-            prediction = self.predict_single_agent_cost(agent, task)
-            agent_costs.append(prediction)
-            total_cost += prediction["total_cost"]
+        Identical task shapes are served from a module-level cache, so
+        repeated demo runs and monthly projections reuse the prediction.
+        """
+        cached = _predict_cached(
+            self._price_key,
+            (task.estimated_turns, task.repo_context_tokens),
+            avg_output_tokens,
+            coordination_overhead,
+        )
         
-        # Add coordination overhead (agents sharing context)
-        coordination_cost = total_cost * coordination_overhead
-        total_with_overhead = total_cost + coordination_cost
+        agent_costs = [
+            {
+                "agent": agent.name,
+                "model": agent.model,
+                "total_cost": cost,
+                "total_input_tokens": cached.total_input_tokens,
+                "total_output_tokens": cached.total_output_tokens,
+            }
+            for agent, cost in zip(self.agents, cached.agent_costs)
+        ]
         
         return {
             "task": task.description,
             "agents": len(self.agents),
             "agent_breakdown": agent_costs,
-            "subtotal": total_cost,
-            "coordination_overhead": coordination_cost,
-            "total_predicted_cost": total_with_overhead,
-            "cost_per_turn_avg": total_with_overhead / task.estimated_turns
+            "subtotal": cached.subtotal,
+            "coordination_overhead": cached.coordination_overhead,
+            "total_predicted_cost": cached.total_predicted_cost,
+            "cost_per_turn_avg": cached.cost_per_turn_avg
         }
     
+    def predict_many(self, tasks: List[Task]) -> List[Dict]:
+        """
+        Predict workflow costs for many tasks, in task order.
+        Each prediction is closed-form and memoized, so the batch runs serially;
+        use predict_batch for large parameter sweeps.
+        """
+        return [self.predict_parallel_workflow_cost(task) for task in tasks]
+    
+    def predict_batch(
+        self,
+        tasks: List[Task],
+        avg_output_tokens: int = 1000
+    ) -> np.ndarray:
+        """
+        Predict every agent's cost for many tasks in one kernel call.
+        Returns a (len(tasks), len(agents)) array of costs in USD, without
+        coordination overhead, for parameter sweeps over task shapes.
+        """
+        turns = np.array([t.estimated_turns for t in tasks], dtype=np.int64)
+        base_in = np.array(
+            [SYSTEM_PROMPT_TOKENS + t.repo_context_tokens for t in tasks], dtype=np.int64
+        )
+        delta = np.full(len(tasks), avg_output_tokens + ACK_TOKENS, dtype=np.int64)
+        avg_out = np.full(len(tasks), avg_output_tokens, dtype=np.int64)
+        return batch_predict(turns, base_in, delta, avg_out, self._in_prices, self._out_prices)
+    
     def suggest_optimizations(self, prediction: Dict) -> List[Dict]:
         """
         EcoCompute's optimization suggestions to reduce costs.
         Returns realistic, non-overlapping savings.
         """
-        suggestions = []
-        remaining_cost = prediction["total_predicted_cost"]
-        
-        # Check for expensive models on simple tasks (pick the most expensive one)
-        pro_agents = [a for a in prediction["agent_breakdown"] if "pro" in a["model"].lower()]
-        if pro_agents:
-            # Only suggest downgrading the most expensive Pro agent
-            most_expensive = max(pro_agents, key=lambda x: x["total_cost"])
-            savings = most_expensive["total_cost"] * 0.85  # Flash is ~10x cheaper, save 85%
-            suggestions.append({
-                "type": "MODEL_DOWNGRADE",
-                "agent": most_expensive["agent"],
-                "current_model": most_expensive["model"],
-                "suggested_model": "gemini-2.0-flash",
-                "potential_savings": savings,
-                "recommendation": f"Downgrade {most_expensive['agent']} to Flash for routine tasks"
-            })
-            remaining_cost -= savings
-        
-        # Check for context ballooning (only if still significant cost)
-        if remaining_cost > 2.0:
-            context_savings = remaining_cost * 0.20  # 20% savings from context pruning
-            suggestions.append({
-                "type": "CONTEXT_PRUNING",
-                "recommendation": "Implement sliding window context (keep last 5 turns only)",
-                "potential_savings": context_savings
-            })
-            remaining_cost -= context_savings
-        
-        # Check for parallelization waste
-        if prediction["agents"] > 3 and remaining_cost > 1.0:
-            consolidation_savings = prediction["coordination_overhead"] * 0.4
-            suggestions.append({
-                "type": "AGENT_CONSOLIDATION",
-                "recommendation": f"Merge {prediction['agents']} agents into 3 specialized agents",
-                "potential_savings": consolidation_savings
-            })
-        
-        return suggestions
+        suggestions = _suggest_cached(
+            tuple((a["agent"], a["model"], a["total_cost"]) for a in prediction["agent_breakdown"]),
+            prediction["total_predicted_cost"],
+            prediction["agents"],
+            prediction["coordination_overhead"],
+        )
+        # Hand out copies so callers cannot mutate the cached suggestions
+        return [dict(suggestion) for suggestion in suggestions]
 
 
 # ============================================================
@@ -3,8 +3,14 @@ Token FinOps Prototype - EcoCompute AI
 Simulates multi-agent interaction costs for Google Antigravity/Gemini agents.
 """
 
+import sys
 from dataclasses import dataclass
-from typing import List, Dict
+from functools import lru_cache
+from typing import List, Dict, Tuple
+
+import numpy as np
+
+from finops_kernels import simulate_turns
 
 @dataclass
 class ModelPricing:
@@ -25,6 +31,9 @@ class ModelPricing:
 GEMINI_1_5_PRO = ModelPricing("Gemini 1.5 Pro", 0.0035, 0.0105, 2_000_000) # $3.50/$10.50 per 1M
 GEMINI_1_5_FLASH = ModelPricing("Gemini 1.5 Flash", 0.00035, 0.00105, 1_000_000) # $0.35/$1.05 per 1M
 
+# Assumed short user feedback/ack appended to history every turn
+USER_ACK_TOKENS = 50
+
 @dataclass
 class AgentConfig:
     name: str
@@ -38,64 +47,136 @@ class TaskProfile:
     estimated_turns: int
     avg_output_tokens_per_turn: int
 
+@dataclass
+class AgentFleet:
+    """
+    Structure-of-arrays view of a list of AgentConfig: one NumPy array per
+    field, so a whole fleet is costed with vectorized expressions.
+    """
+    names: List[str]
+    in_prices: np.ndarray    # $ per 1K input tokens
+    out_prices: np.ndarray   # $ per 1K output tokens
+    ctx_windows: np.ndarray
+    sys_tokens: np.ndarray
+
+    @classmethod
+    def from_configs(cls, configs: List[AgentConfig]) -> "AgentFleet":
+        return cls(
+            names=[c.name for c in configs],
+            in_prices=np.array([c.model.input_price_per_1k for c in configs], dtype=np.float64),
+            out_prices=np.array([c.model.output_price_per_1k for c in configs], dtype=np.float64),
+            ctx_windows=np.array([c.model.context_window for c in configs], dtype=np.int64),
+            sys_tokens=np.array([c.system_prompt_tokens for c in configs], dtype=np.int64),
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+@lru_cache(maxsize=512)
+def _simulate_pure(system_prompt_tokens: int, repo_context_tokens: int, turns: int,
+                   avg_output_tokens: int, input_price_per_1k: float,
+                   output_price_per_1k: float, context_window: int) -> Tuple[float, int, int]:
+    """
+    Closed-form (total cost, input tokens, output tokens) of one agent running
+    a task. Input tokens grow by a constant each turn, so they sum as an
+    arithmetic series. Keyed on plain scalars so sweeps that revisit the same
+    configuration hit the cache.
+    """
+    first_input = system_prompt_tokens + repo_context_tokens
+    growth = avg_output_tokens + USER_ACK_TOKENS
+    
+    # Turns that fit before the context window is exceeded
+    if first_input > context_window:
+        turns_run = 0
+    else:
+        turns_run = max(0, min(turns, (context_window - first_input) // growth + 1))
+    
+    total_input_tokens = turns_run * first_input + growth * turns_run * (turns_run - 1) // 2
+    total_output_tokens = turns_run * avg_output_tokens
+    total_cost = (
+        (total_input_tokens / 1000) * input_price_per_1k
+        + (total_output_tokens / 1000) * output_price_per_1k
+    )
+    return total_cost, total_input_tokens, total_output_tokens
+
 class TokenFinOpsEngine:
     def __init__(self, agents: List[AgentConfig]):
         self.agents = agents
+        self.fleet = AgentFleet.from_configs(agents)
 
-    def simulate_task(self, task: TaskProfile) -> Dict:
+    def simulate_task(self, task: TaskProfile, verbose: bool = True) -> Dict:
         """
         Simulates the cost of running a multi-agent task.
         Assumes a shared context model (all agents see conversation history).
+        With verbose=False the per-turn log is skipped and the totals are
+        computed in closed form.
         """
-        total_cost = 0.0
-        total_input_tokens = 0
-        total_output_tokens = 0
+        if not verbose:
+            return self._simulate_closed_form(task)
+        
+        # In this simple model, we assume round-robin or one active agent per turn
+        # For worst-case estimation, let's assume the primary agent (first in list) acts
+        active_agent = self.agents[0]
+        
+        # Input = System Prompt + Repo Context + History; history starts empty
+        # and balloons by the agent's output plus the user/other agent's reply
+        first_input = active_agent.system_prompt_tokens + task.repo_context_tokens
+        growth = task.avg_output_tokens_per_turn + USER_ACK_TOKENS
+        context_window = active_agent.model.context_window
         
-        # Conversation history starts empty
-        history_tokens = 0
+        # The turn arithmetic runs in one compiled kernel call
+        input_tokens, turn_costs, cumulative_costs = simulate_turns(
+            first_input, 0, task.estimated_turns, task.avg_output_tokens_per_turn, growth,
+            active_agent.model.input_price_per_1k, active_agent.model.output_price_per_1k,
+            context_window,
+        )
+        turns_run = len(input_tokens)
+        total_cost = float(cumulative_costs[-1]) if turns_run else 0.0
+        total_input_tokens = int(input_tokens.sum())
+        total_output_tokens = turns_run * task.avg_output_tokens_per_turn
         
-        print(f"--- Simulation: {task.name} ---")
-        print(f"Agents: {[a.name for a in self.agents]}")
-        print(f"Repo Context: {task.repo_context_tokens:,} tokens")
-        print(f"Est. Turns: {task.estimated_turns}")
-        print("-" * 30)
-
-        for turn in range(1, task.estimated_turns + 1):
-            # In this simple model, we assume round-robin or one active agent per turn
-            # For worst-case estimation, let's assume the primary agent (first in list) acts
-            active_agent = self.agents[0] 
-            
-            # Input = System Prompt + Repo Context + History
-            current_input_tokens = (
-                active_agent.system_prompt_tokens + 
-                task.repo_context_tokens + 
-                history_tokens
+        # The log is collected and written once rather than printed per turn
+        log_lines = [
+            f"--- Simulation: {task.name} ---",
+            f"Agents: {[a.name for a in self.agents]}",
+            f"Repo Context: {task.repo_context_tokens:,} tokens",
+            f"Est. Turns: {task.estimated_turns}",
+            "-" * 30,
+        ]
+        log_lines += [
+            f"Turn {turn:2}: Input={current_input_tokens:6,} | Cost=${turn_cost:.4f} | Cumulative=${cumulative_cost:.4f}"
+            for turn, (current_input_tokens, turn_cost, cumulative_cost) in enumerate(
+                zip(input_tokens.tolist(), turn_costs.tolist(), cumulative_costs.tolist()), 1
             )
-            
-            # Check context window
-            if current_input_tokens > active_agent.model.context_window:
-                print(f"⚠️ Turn {turn}: Context Limit Exceeded! ({current_input_tokens:,} > {active_agent.model.context_window:,})")
-                break
-
-            # Calculate Cost for this turn
-            input_cost = (current_input_tokens / 1000) * active_agent.model.input_price_per_1k
-            output_cost = (task.avg_output_tokens_per_turn / 1000) * active_agent.model.output_price_per_1k
-            turn_cost = input_cost + output_cost
-
-            # Update totals
-            total_cost += turn_cost
-            total_input_tokens += current_input_tokens
-            total_output_tokens += task.avg_output_tokens_per_turn
-            
-            # Update history (The "Ballooning" Effect)
-            # The agent's output is added to the history for the next turn
-            history_tokens += task.avg_output_tokens_per_turn
-            
-            # Simulate User/Other Agent response adding to history as well
-            history_tokens += 50 # Assumed short user feedback/ack
-
-            print(f"Turn {turn:2}: Input={current_input_tokens:6,} | Cost=${turn_cost:.4f} | Cumulative=${total_cost:.4f}")
+        ]
+        
+        # Check context window
+        if turns_run < task.estimated_turns:
+            current_input_tokens = first_input + growth * turns_run
+            log_lines.append(f"⚠️ Turn {turns_run + 1}: Context Limit Exceeded! ({current_input_tokens:,} > {context_window:,})")
+        
+        sys.stdout.write("\n".join(log_lines) + "\n")
+
+        return {
+            "task": task.name,
+            "total_cost": round(total_cost, 4),
+            "total_tokens": total_input_tokens + total_output_tokens,
+            "turns": task.estimated_turns
+        }
 
+    def _simulate_closed_form(self, task: TaskProfile) -> Dict:
+        """Same totals as the turn loop, computed by the memoized closed form."""
+        active_agent = self.agents[0]
+        total_cost, total_input_tokens, total_output_tokens = _simulate_pure(
+            active_agent.system_prompt_tokens,
+            task.repo_context_tokens,
+            task.estimated_turns,
+            task.avg_output_tokens_per_turn,
+            active_agent.model.input_price_per_1k,
+            active_agent.model.output_price_per_1k,
+            active_agent.model.context_window,
+        )
+        
         return {
             "task": task.name,
             "total_cost": round(total_cost, 4),
@@ -103,6 +184,99 @@ class TokenFinOpsEngine:
             "turns": task.estimated_turns
         }
 
+    def simulate_task_batch(self, tasks: List[TaskProfile]) -> List[List[Dict]]:
+        """
+        Simulates every task with every agent of the engine as the acting
+        agent; result[i][j] is tasks[i] run by self.agents[j]. All
+        (task, agent) pairs are evaluated in one vectorized pass over the fleet.
+        """
+        fleet = self.fleet
+        n_agents = len(fleet)
+        repo_context, output_tokens, estimated_turns = self._task_arrays(tasks)
+        
+        total_cost, total_tokens = self._simulate_scenarios(
+            first_input=(repo_context[:, None] + fleet.sys_tokens).ravel(),
+            output_tokens=np.repeat(output_tokens, n_agents),
+            estimated_turns=np.repeat(estimated_turns, n_agents),
+            context_window=np.tile(fleet.ctx_windows, len(tasks)),
+            in_price=np.tile(fleet.in_prices, len(tasks)),
+            out_price=np.tile(fleet.out_prices, len(tasks)),
+        )
+        total_cost = total_cost.reshape(len(tasks), n_agents)
+        total_tokens = total_tokens.reshape(len(tasks), n_agents)
+        
+        return [
+            [
+                {
+                    "task": task.name,
+                    "total_cost": round(cost, 4),
+                    "total_tokens": tokens,
+                    "turns": task.estimated_turns
+                }
+                for cost, tokens in zip(costs, tokens_row)
+            ]
+            for task, costs, tokens_row in zip(tasks, total_cost.tolist(), total_tokens.tolist())
+        ]
+
+    @staticmethod
+    def simulate_batch(tasks: List[TaskProfile], agents: List[AgentConfig]) -> List[Dict]:
+        """
+        Simulates many scenarios at once; scenario i runs tasks[i] with
+        agents[i] as the acting agent. Per-turn token series are evaluated as
+        a (scenarios x turns) NumPy array instead of one Python loop each.
+        """
+        fleet = AgentFleet.from_configs(agents)
+        repo_context, output_tokens, estimated_turns = TokenFinOpsEngine._task_arrays(tasks)
+        
+        total_cost, total_tokens = TokenFinOpsEngine._simulate_scenarios(
+            first_input=fleet.sys_tokens + repo_context,
+            output_tokens=output_tokens,
+            estimated_turns=estimated_turns,
+            context_window=fleet.ctx_windows,
+            in_price=fleet.in_prices,
+            out_price=fleet.out_prices,
+        )
+        
+        return [
+            {
+                "task": task.name,
+                "total_cost": round(float(cost), 4),
+                "total_tokens": int(tokens),
+                "turns": task.estimated_turns
+            }
+            for task, cost, tokens in zip(tasks, total_cost, total_tokens)
+        ]
+
+    @staticmethod
+    def _task_arrays(tasks: List[TaskProfile]):
+        """Repo context, output tokens per turn and turns of each task as arrays."""
+        return (
+            np.array([t.repo_context_tokens for t in tasks], dtype=np.int64),
+            np.array([t.avg_output_tokens_per_turn for t in tasks], dtype=np.int64),
+            np.array([t.estimated_turns for t in tasks], dtype=np.int64),
+        )
+
+    @staticmethod
+    def _simulate_scenarios(first_input, output_tokens, estimated_turns,
+                            context_window, in_price, out_price):
+        """
+        Total cost and tokens per scenario; every argument is a parallel 1-D
+        array with one entry per scenario.
+        """
+        turn = np.arange(estimated_turns.max(initial=0))
+        growth = output_tokens + USER_ACK_TOKENS
+        
+        input_tokens = first_input[:, None] + growth[:, None] * turn
+        # Input only grows, so the first turn over the window ends the run
+        ran = (input_tokens <= context_window[:, None]) & (turn < estimated_turns[:, None])
+        turn_cost = (
+            (input_tokens / 1000) * in_price[:, None]
+            + (output_tokens / 1000 * out_price)[:, None]
+        )
+        total_cost = np.where(ran, turn_cost, 0.0).sum(axis=1)
+        total_tokens = np.where(ran, input_tokens + output_tokens[:, None], 0).sum(axis=1)
+        return total_cost, total_tokens
+
 def run_demo():
     # Scenario 1: Expensive Configuration
     # A generic "Manager" agent using Pro model with full repo context
@@ -7,11 +7,30 @@ Analyzes Python files for AI/ML code and predicts training costs and carbon foot
 import os
 import sys
 import json
+import fnmatch
+import functools
 import glob
+import hashlib
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Optional
+from dataclasses import dataclass, fields
+from typing import List, Dict, Optional, Tuple
+
+try:
+    import hyperscan
+except ImportError:  # Optional: fall back to the re-based scan
+    hyperscan = None
+
+try:
+    import ahocorasick
+except ImportError:  # Optional: fall back to a regex alternation
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the stdlib encoder
+    orjson = None
 
 # GPU Cost Database (USD per hour, based on cloud pricing)
 GPU_COSTS = {
@@ -57,6 +76,110 @@ ML_PATTERNS = {
     ],
 }
 
+# Imports that mark a file as ML code
+ML_IMPORTS = [
+    "import torch", "from torch", 
+    "import tensorflow", "from tensorflow",
+    "import keras", "from keras",
+    "import jax", "from jax",
+]
+ML_IMPORT_BYTES = tuple(imp.encode() for imp in ML_IMPORTS)
+
+# One bit per ML_PATTERNS category; a file's matches fold into a single int mask
+CATEGORY_BITS = {category: 1 << i for i, category in enumerate(ML_PATTERNS)}
+TRAINING_BITS = sum(bit for category, bit in CATEGORY_BITS.items() if "training" in category)
+LARGE_MODEL_BIT = CATEGORY_BITS["large_model"]
+
+# Bump whenever ML_PATTERNS or the per-file scoring changes; invalidates the cache
+ANALYZER_VERSION = "1"
+
+# Per-file results keyed by content hash, reused across runs ("" disables)
+CACHE_DIR = os.environ.get("ECOCOMPUTE_CACHE_DIR", ".ecocompute_cache")
+CACHE_FILE = "analysis_cache.json"
+
+# Files shorter than the shortest ML import cannot be ML code; files larger
+# than MAX_FILE_SIZE are almost always generated or vendored and are skipped
+MIN_ML_FILE_SIZE = min(len(imp) for imp in ML_IMPORTS)
+MAX_FILE_SIZE = 2 * 1024 * 1024
+
+# Below this many files, process pool start-up costs more than it saves
+PARALLEL_MIN_FILES = 64
+
+@functools.lru_cache(maxsize=None)
+def compiled_ml_patterns() -> List[Tuple]:
+    """
+    Flat [(regex, category bit)] table compiled as bytes regexes on first use
+    (once per worker process), one alternation per category so each category
+    costs one scan.
+    """
+    return [
+        (re.compile("|".join(f"(?:{p})" for p in patterns).encode()), CATEGORY_BITS[category])
+        for category, patterns in ML_PATTERNS.items()
+    ]
+
+@functools.lru_cache(maxsize=None)
+def ml_imports_automaton():
+    """Aho-Corasick automaton over ML_IMPORTS, or None without pyahocorasick."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for imp in ML_IMPORTS:
+        automaton.add_word(imp, imp)
+    automaton.make_automaton()
+    return automaton
+
+def has_ml_import(content: bytes) -> bool:
+    """True if content contains any ML import, stopping at the first hit."""
+    automaton = ml_imports_automaton()
+    if automaton is not None:
+        # The automaton works on str; latin-1 maps each byte to one character
+        # without validation, and the import literals are plain ASCII
+        return next(automaton.iter(content.decode("latin-1")), None) is not None
+    return any(imp in content for imp in ML_IMPORT_BYTES)
+
+# Flat (category, regex) list; the index doubles as the Hyperscan pattern id.
+# Import literals follow the ML patterns so one scan answers both questions.
+FLAT_ML_PATTERNS = [
+    (category, pattern)
+    for category, patterns in ML_PATTERNS.items()
+    for pattern in patterns
+]
+PATTERN_BITS = [CATEGORY_BITS[category] for category, _ in FLAT_ML_PATTERNS]
+
+def build_hyperscan_db():
+    """Compile every ML pattern and import literal into one Hyperscan DFA."""
+    expressions = [pattern for _, pattern in FLAT_ML_PATTERNS]
+    expressions += [re.escape(imp) for imp in ML_IMPORTS]
+    db = hyperscan.Database()
+    db.compile(
+        expressions=[e.encode() for e in expressions],
+        ids=list(range(len(expressions))),
+        elements=len(expressions),
+        flags=[hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_DOTALL] * len(expressions),
+    )
+    return db
+
+@functools.lru_cache(maxsize=None)
+def hyperscan_db():
+    """Hyperscan database compiled on first use, or None without hyperscan."""
+    return build_hyperscan_db() if hyperscan is not None else None
+
+def scan_hyperscan(content: bytes) -> Tuple[bool, int]:
+    """Single-pass scan returning (has ML import, mask of matched categories)."""
+    num_patterns = len(FLAT_ML_PATTERNS)
+    is_ml = False
+    found_mask = 0
+    
+    def on_match(pattern_id, start, end, flags, context):
+        nonlocal is_ml, found_mask
+        if pattern_id < num_patterns:
+            found_mask |= PATTERN_BITS[pattern_id]
+        else:
+            is_ml = True
+    
+    hyperscan_db().scan(content, match_event_handler=on_match)
+    return is_ml, found_mask
+
 @dataclass
 class AnalysisResult:
     estimated_cost: float
@@ -69,62 +192,221 @@ class AnalysisResult:
     passed: bool
     details: Dict
 
+def shallow_asdict(obj) -> Dict:
+    """Top-level fields of a dataclass as a dict, without asdict's deep copy."""
+    return {f.name: getattr(obj, f.name) for f in fields(obj)}
+
+# Directories never worth descending into
+SKIP_DIRS = {"node_modules", "__pycache__"}
+
+def compile_glob(pattern: str) -> List:
+    """
+    Split a recursive glob into per-component matchers: None for "**",
+    otherwise (fnmatch regex, whether the component may match hidden names).
+    """
+    return [
+        None if part == "**" else (re.compile(fnmatch.translate(part)), part.startswith("."))
+        for part in pattern.replace(os.sep, "/").split("/")
+    ]
+
+def glob_match(components: List, names: List[str], prefix: bool = False) -> bool:
+    """
+    Match path components against a compiled glob with glob.glob semantics:
+    "**" spans zero or more directories, and only components that start with
+    "." match hidden names. With prefix=True, names is a directory and the
+    result says whether anything below it could match.
+    """
+    if not names:
+        return bool(components) if prefix else all(c is None for c in components)
+    if not components:
+        return False
+    head = components[0]
+    if head is None:
+        if glob_match(components[1:], names, prefix):
+            return True
+        return not names[0].startswith(".") and glob_match(components, names[1:], prefix)
+    regex, matches_hidden = head
+    if names[0].startswith(".") and not matches_hidden:
+        return False
+    return regex.match(names[0]) is not None and glob_match(components[1:], names[1:], prefix)
+
+def dir_identity(path: str) -> Optional[Tuple[int, int]]:
+    """(device, inode) of the directory path resolves to, or None if unreadable."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_dev, st.st_ino
+
+def is_outside_pattern(pattern: str) -> bool:
+    """True for absolute patterns and patterns that climb out with ".."."""
+    return os.path.isabs(pattern) or ".." in pattern.replace(os.sep, "/").split("/")
+
 def find_python_files(include_patterns: str, exclude_patterns: str) -> List[Path]:
-    """Find Python files matching include patterns, excluding specified patterns."""
-    include_list = [p.strip() for p in include_patterns.split(",")]
-    exclude_list = [p.strip() for p in exclude_patterns.split(",")]
-    
-    files = set()
-    for pattern in include_list:
-        files.update(glob.glob(pattern, recursive=True))
-    
-    # Remove excluded files
-    for pattern in exclude_list:
-        excluded = set(glob.glob(pattern, recursive=True))
-        files -= excluded
+    """
+    Find Python files matching include patterns, excluding specified patterns.
+    
+    Patterns inside the working directory are matched during a single walk;
+    symlinked directories are followed like glob.glob does, except into one
+    of their own ancestors. Absolute and ".." patterns go through glob.glob.
+    """
+    def split_patterns(patterns: str):
+        stripped = (p.strip() for p in patterns.split(","))
+        return [p[2:] if p.startswith("./") else p for p in stripped if p]
+    
+    include_patterns = split_patterns(include_patterns)
+    exclude_patterns = split_patterns(exclude_patterns)
+    outside_includes = [p for p in include_patterns if is_outside_pattern(p)]
+    include_list = [compile_glob(p) for p in include_patterns if not is_outside_pattern(p)]
+    exclude_list = [compile_glob(p) for p in exclude_patterns]
+    
+    # A trailing "**" exclude covers a whole directory, except hidden entries
+    # below it, which only an include naming a hidden component could reach
+    includes_hidden = any(c and c[1] for components in include_list for c in components)
+    dir_excludes = [] if includes_hidden else [
+        components[:-1] for components in exclude_list if components[-1] is None
+    ]
     
-    return [Path(f) for f in files if f.endswith(".py")]
+    # One walk of the tree; only directories an include could match below
+    # are entered, and every pattern is matched in memory
+    files = []
+    ancestors = {".": frozenset([dir_identity(".")])} if include_list else {}
+    for root, dirs, filenames in os.walk(".", followlinks=True):
+        root_ancestors = ancestors.pop(root, None)
+        if root_ancestors is None:
+            # No in-tree include patterns, so there is nothing to walk
+            dirs[:] = []
+            continue
+        rel_root = os.path.relpath(root, ".")
+        rel_parts = [] if rel_root == os.curdir else rel_root.split(os.sep)
+        kept = []
+        for d in sorted(dirs):
+            if (d in SKIP_DIRS
+                    or not any(glob_match(c, rel_parts + [d], prefix=True) for c in include_list)
+                    or any(glob_match(c, rel_parts + [d]) for c in dir_excludes)):
+                continue
+            # Symlink loops would otherwise recurse forever
+            identity = dir_identity(os.path.join(root, d))
+            if identity is None or identity in root_ancestors:
+                continue
+            ancestors[os.path.join(root, d)] = root_ancestors | {identity}
+            kept.append(d)
+        dirs[:] = kept
+        for filename in sorted(filenames):
+            if not filename.endswith(".py"):
+                continue
+            names = rel_parts + [filename]
+            if (any(glob_match(c, names) for c in include_list)
+                    and not any(glob_match(c, names) for c in exclude_list)):
+                files.append(Path(*names))
+    
+    # Patterns outside the working directory keep glob.glob's matching
+    if outside_includes:
+        outside = set()
+        for pattern in outside_includes:
+            outside.update(f for f in glob.glob(pattern, recursive=True) if f.endswith(".py"))
+        for pattern in exclude_patterns:
+            outside.difference_update(glob.glob(pattern, recursive=True))
+        seen = set(files)
+        files += [Path(f) for f in sorted(outside) if Path(f) not in seen]
+    
+    return files
+
+@functools.lru_cache(maxsize=None)
+def analysis_cache() -> Dict:
+    """Cached per-file analyses from the previous run (loaded once per process)."""
+    if not CACHE_DIR:
+        return {}
+    try:
+        with open(os.path.join(CACHE_DIR, CACHE_FILE), encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != ANALYZER_VERSION:
+        return {}
+    return cache.get("entries", {})
+
+def save_analysis_cache(file_results: List[Dict]) -> None:
+    """Persist this run's per-file analyses; stale entries are dropped."""
+    if not CACHE_DIR:
+        return
+    entries = {
+        r["cache_key"]: {
+            "is_ml": r["is_ml"],
+            "has_training": r["has_training"],
+            "patterns_found": sorted(r["patterns_found"]),
+            "complexity_score": r["complexity_score"],
+        }
+        for r in file_results
+        if "cache_key" in r
+    }
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(os.path.join(CACHE_DIR, CACHE_FILE), "w", encoding="utf-8") as f:
+            json.dump({"version": ANALYZER_VERSION, "entries": entries}, f)
+    except OSError as e:
+        print(f"   ⚠️ Could not write analysis cache: {e}")
 
 def analyze_file(filepath: Path) -> Dict:
     """Analyze a single Python file for ML patterns."""
     try:
-        content = filepath.read_text(encoding="utf-8", errors="ignore")
+        # Sizes come from one stat, so skipped files are never read
+        size = filepath.stat().st_size
+        if size > MAX_FILE_SIZE:
+            return {"filepath": str(filepath), "is_ml": False, "skipped": "too_large"}
+        if size < MIN_ML_FILE_SIZE:
+            return {"filepath": str(filepath), **analyze_content(b"")}
+        
+        # All patterns are ASCII, so scan the raw bytes without decoding
+        content = filepath.read_bytes()
     except Exception as e:
         return {"error": str(e), "is_ml": False}
     
+    # Unchanged files are served from the cache of the previous run
+    cache_key = hashlib.blake2b(content, digest_size=16).hexdigest()
+    cached = analysis_cache().get(cache_key)
+    if cached is not None:
+        analysis = dict(cached, patterns_found=set(cached["patterns_found"]))
+    else:
+        analysis = analyze_content(content)
+    
+    return {"filepath": str(filepath), "cache_key": cache_key, **analysis}
+
+def analyze_content(content: bytes) -> Dict:
+    """Analyze the contents of a Python file for ML patterns."""
     result = {
-        "filepath": str(filepath),
         "is_ml": False,
         "has_training": False,
-        "patterns_found": [],
+        "patterns_found": set(),
         "complexity_score": 0,
     }
     
-    # Check for ML imports
-    ml_imports = [
-        "import torch", "from torch", 
-        "import tensorflow", "from tensorflow",
-        "import keras", "from keras",
-        "import jax", "from jax",
-    ]
-    
-    for imp in ml_imports:
-        if imp in content:
-            result["is_ml"] = True
-            break
-    
-    # Check for ML patterns
-    for category, patterns in ML_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, content):
-                result["patterns_found"].append(category)
-                if "training" in category:
-                    result["has_training"] = True
-                if "large_model" in category:
-                    result["complexity_score"] += 10
+    if hyperscan_db() is not None:
+        result["is_ml"], found_mask = scan_hyperscan(content)
+        if not result["is_ml"]:
+            return result
+    else:
+        # Check for ML imports; most files have none, so stop here for them
+        result["is_ml"] = has_ml_import(content)
+        if not result["is_ml"]:
+            return result
+        
+        # Check for ML patterns; one hit is enough to flag a category
+        found_mask = 0
+        for pattern, bit in compiled_ml_patterns():
+            if pattern.search(content):
+                found_mask |= bit
+    
+    result["patterns_found"] = {
+        category for category, bit in CATEGORY_BITS.items() if found_mask & bit
+    }
+    if found_mask & TRAINING_BITS:
+        result["has_training"] = True
+    if found_mask & LARGE_MODEL_BIT:
+        result["complexity_score"] += 10
     
     # Estimate complexity based on code size
-    lines = len(content.split("\n"))
+    lines = content.count(b"\n") + 1
     if lines > 500:
         result["complexity_score"] += 5
     if lines > 1000:
@@ -132,20 +414,56 @@ def analyze_file(filepath: Path) -> Dict:
     
     return result
 
+def encode_json(obj, indent: bool = False) -> bytes:
+    """Serialize obj to UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+@functools.lru_cache(maxsize=32)
+def resolve_pricing(gpu: str, region: str) -> Tuple[Dict, int]:
+    """GPU cost entry and carbon intensity, falling back to the defaults."""
+    return (
+        GPU_COSTS.get(gpu, GPU_COSTS["nvidia-a100"]),
+        CARBON_INTENSITY.get(region, CARBON_INTENSITY["default"]),
+    )
+
+def summarize_results(file_results: List[Dict]) -> Dict:
+    """Aggregate per-file analyses in a single pass over the results."""
+    total_complexity = training_files = ml_files = 0
+    has_large_model = has_data_loading = False
+    for r in file_results:
+        total_complexity += r.get("complexity_score", 0)
+        if r.get("has_training", False):
+            training_files += 1
+        if r.get("is_ml", False):
+            ml_files += 1
+        patterns_found = r.get("patterns_found", ())
+        if "large_model" in patterns_found:
+            has_large_model = True
+        if "data_loading" in patterns_found:
+            has_data_loading = True
+    
+    return {
+        "total_complexity": total_complexity,
+        "training_files": training_files,
+        "ml_files": ml_files,
+        "has_large_model": has_large_model,
+        "has_data_loading": has_data_loading,
+    }
+
 def estimate_costs(
-    file_results: List[Dict],
+    summary: Dict,
     gpu: str,
     region: str = "default"
 ) -> Dict:
-    """Estimate training costs based on analysis results."""
+    """Estimate training costs based on summarized analysis results."""
     
-    gpu_info = GPU_COSTS.get(gpu, GPU_COSTS["nvidia-a100"])
-    carbon_intensity = CARBON_INTENSITY.get(region, CARBON_INTENSITY["default"])
+    gpu_info, carbon_intensity = resolve_pricing(gpu, region)
     
-    # Calculate complexity score
-    total_complexity = sum(r.get("complexity_score", 0) for r in file_results)
-    training_files = sum(1 for r in file_results if r.get("has_training", False))
-    ml_files = sum(1 for r in file_results if r.get("is_ml", False))
+    total_complexity = summary["total_complexity"]
+    training_files = summary["training_files"]
+    ml_files = summary["ml_files"]
     
     # Estimate training hours (simplified model)
     # Base: 1 hour per training file, scaled by complexity
@@ -167,13 +485,12 @@ def estimate_costs(
         "total_complexity": total_complexity,
     }
 
-def generate_suggestions(file_results: List[Dict], costs: Dict) -> List[Dict]:
+def generate_suggestions(summary: Dict, costs: Dict) -> List[Dict]:
     """Generate optimization suggestions based on analysis."""
     suggestions = []
     
     # Check for large models without optimization
-    large_model_files = [r for r in file_results if "large_model" in r.get("patterns_found", [])]
-    if large_model_files:
+    if summary["has_large_model"]:
         suggestions.append({
             "title": "Consider Mixed Precision Training",
             "description": "Large models detected. Using FP16/BF16 can reduce memory and speed up training by 2x.",
@@ -191,8 +508,7 @@ def generate_suggestions(file_results: List[Dict], costs: Dict) -> List[Dict]:
         })
     
     # Suggest efficient data loading
-    data_loading_files = [r for r in file_results if "data_loading" in r.get("patterns_found", [])]
-    if data_loading_files:
+    if summary["has_data_loading"]:
         suggestions.append({
             "title": "Optimize DataLoader",
             "description": "Consider using pin_memory=True and appropriate num_workers for faster data loading.",
@@ -217,7 +533,7 @@ def generate_report(result: AnalysisResult, budget_limit: float, carbon_limit: f
     status_emoji = "✅" if result.passed else "❌"
     status_text = "PASSED" if result.passed else "FAILED"
     
-    report = f"""## 🌿 EcoCompute AI Cost Analysis Report
+    parts = [f"""## 🌿 EcoCompute AI Cost Analysis Report
 
 ### {status_emoji} Status: **{status_text}**
 
@@ -233,21 +549,21 @@ def generate_report(result: AnalysisResult, budget_limit: float, carbon_limit: f
 - **ML Files Found**: {result.ml_files_found}
 - **Training Loops Detected**: {result.training_loops_detected}
 
-"""
+"""]
     
     if result.optimization_suggestions:
-        report += "### 💡 Optimization Suggestions\n\n"
+        parts.append("### 💡 Optimization Suggestions\n\n")
         for i, suggestion in enumerate(result.optimization_suggestions, 1):
             priority_emoji = {"high": "🔴", "medium": "🟡", "low": "🟢"}.get(suggestion["priority"], "⚪")
-            report += f"{i}. {priority_emoji} **{suggestion['title']}**\n"
-            report += f"   - {suggestion['description']}\n"
-            report += f"   - Potential Savings: {suggestion['potential_savings']}\n\n"
+            parts.append(f"{i}. {priority_emoji} **{suggestion['title']}**\n")
+            parts.append(f"   - {suggestion['description']}\n")
+            parts.append(f"   - Potential Savings: {suggestion['potential_savings']}\n\n")
     
-    report += """---
+    parts.append("""---
 <sub>Powered by [EcoCompute AI](https://github.com/hongping-zh/ecocompute-ai) | [Live Demo](https://ecocompute-ai-l7e41qn4gf.edgeone.dev/)</sub>
-"""
+""")
     
-    return report
+    return "".join(parts)
 
 def main():
     # Get environment variables
@@ -267,18 +583,30 @@ def main():
     files = find_python_files(include_patterns, exclude_patterns)
     print(f"📁 Found {len(files)} Python files to analyze")
     
-    file_results = []
-    for f in files:
-        result = analyze_file(f)
-        file_results.append(result)
+    if len(files) < PARALLEL_MIN_FILES:
+        file_results = [analyze_file(f) for f in files]
+    else:
+        chunksize = max(1, len(files) // ((os.cpu_count() or 1) * 4))
+        with ProcessPoolExecutor() as executor:
+            file_results = list(executor.map(analyze_file, files, chunksize=chunksize))
+    
+    # executor.map preserves input order, so results line up with files
+    for f, result in zip(files, file_results):
         if result.get("is_ml"):
             print(f"   🔍 ML code found: {f}")
+        elif result.get("skipped") == "too_large":
+            print(f"   ⚠️ Skipped {f}: larger than {MAX_FILE_SIZE // (1024 * 1024)} MB")
+    
+    save_analysis_cache(file_results)
+    
+    # One pass over the results feeds both the estimate and the suggestions
+    summary = summarize_results(file_results)
     
     # Estimate costs
-    costs = estimate_costs(file_results, gpu)
+    costs = estimate_costs(summary, gpu)
     
     # Generate suggestions
-    suggestions = generate_suggestions(file_results, costs)
+    suggestions = generate_suggestions(summary, costs)
     
     # Determine pass/fail
     passed = (costs["estimated_cost"] <= budget_limit and 
@@ -315,8 +643,8 @@ def main():
         print("❌ FAILED - Exceeds budget or carbon limits")
     
     # Save results
-    with open("ecocompute_result.json", "w") as f:
-        json.dump(asdict(result), f, indent=2)
+    with open("ecocompute_result.json", "wb") as f:
+        f.write(encode_json(shallow_asdict(result), indent=True))
     
     # Generate and save report
     report = generate_report(result, budget_limit, carbon_limit)
@@ -330,7 +658,7 @@ def main():
             f.write(f"estimated_cost={result.estimated_cost}\n")
             f.write(f"estimated_carbon={result.estimated_carbon}\n")
             f.write(f"passed={str(result.passed).lower()}\n")
-            f.write(f"optimization_suggestions={json.dumps(result.optimization_suggestions)}\n")
+            f.write(f"optimization_suggestions={encode_json(result.optimization_suggestions).decode()}\n")
     
     print()
     print("📄 Report saved to ecocompute_report.md")
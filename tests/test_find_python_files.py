@@ -0,0 +1,122 @@
+"""
+find_python_files must select the same files as the glob.glob-based lookup
+it replaced.
+"""
+
+import glob
+import importlib.util
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+ANALYZE_PATH = Path(__file__).resolve().parent.parent / "scripts" / "analyze.py"
+_spec = importlib.util.spec_from_file_location("analyze", ANALYZE_PATH)
+analyze = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(analyze)
+
+TREE = [
+    "top.py",
+    ".top.py",
+    "notes.txt",
+    "src/m1.py",
+    "src/m2.py",
+    "src/m3.py",
+    "src/.hidden.py",
+    "src/test_model.py",
+    "src/model_test.py",
+    "src/sub/m1.py",
+    "src/sub/deep/train.py",
+    ".ci/b.py",
+    ".ci/x/a.py",
+    ".ci/.deep/c.py",
+    "build/y/z.py",
+    "build/.h/q.py",
+    "tests/test_x.py",
+]
+
+
+def glob_find(include_patterns, exclude_patterns):
+    """The original glob.glob-based implementation of find_python_files."""
+    files = set()
+    for pattern in include_patterns.split(","):
+        files.update(glob.glob(pattern.strip(), recursive=True))
+    for pattern in exclude_patterns.split(","):
+        files -= set(glob.glob(pattern.strip(), recursive=True))
+    return sorted(os.path.normpath(f) for f in files if f.endswith(".py"))
+
+
+class FindPythonFilesTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self._tmp.name, "repo")
+        for rel in TREE:
+            path = os.path.join(self.root, *rel.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write("x = 1\n")
+        os.chdir(self.root)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def assertMatchesGlob(self, include_patterns, exclude_patterns=""):
+        found = sorted(
+            os.path.normpath(str(f))
+            for f in analyze.find_python_files(include_patterns, exclude_patterns)
+        )
+        self.assertEqual(found, glob_find(include_patterns, exclude_patterns))
+
+    def test_default_patterns(self):
+        self.assertMatchesGlob("**/*.py", "**/test_*.py,**/*_test.py")
+
+    def test_action_style_patterns(self):
+        self.assertMatchesGlob("src/**/*.py,*.py", "**/tests/**,**/test_*.py")
+
+    def test_character_classes(self):
+        self.assertMatchesGlob("src/m[12].py")
+        self.assertMatchesGlob("src/[!m]*.py")
+        self.assertMatchesGlob("**/*.py", "src/m[1].py")
+
+    def test_hidden_includes(self):
+        self.assertMatchesGlob(".ci/**/*.py")
+        self.assertMatchesGlob(".ci/.*/*.py")
+        self.assertMatchesGlob(".*.py")
+
+    def test_directory_excludes(self):
+        self.assertMatchesGlob("**/*.py", "build/**")
+        self.assertMatchesGlob("**/*.py,build/.h/*.py", "build/**")
+        self.assertMatchesGlob("src/**", "src/sub/**")
+
+    def test_absolute_and_parent_patterns(self):
+        self.assertMatchesGlob(os.path.join(self.root, "src", "*.py"))
+        self.assertMatchesGlob("../repo/src/**/*.py", "../repo/src/sub/**")
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "symlinks unsupported")
+    def test_symlinked_directories(self):
+        try:
+            os.symlink(os.path.join(self.root, "src", "sub"), "lnk")
+        except OSError:
+            self.skipTest("cannot create symlinks")
+        self.assertMatchesGlob("lnk/*.py")
+        self.assertMatchesGlob("lnk/**/*.py")
+        self.assertMatchesGlob("**/*.py", "**/test_*.py")
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "symlinks unsupported")
+    def test_symlink_loop_terminates(self):
+        # glob.glob would recurse through the loop, so there is no reference
+        try:
+            os.symlink(self.root, os.path.join("src", "sub", "loop"))
+        except OSError:
+            self.skipTest("cannot create symlinks")
+        found = {
+            str(f).replace(os.sep, "/") for f in analyze.find_python_files("**/*.py", "")
+        }
+        self.assertIn("src/sub/deep/train.py", found)
+        self.assertFalse(any("/loop/" in f for f in found))
+
+
+if __name__ == "__main__":
+    unittest.main()